@@ -1,24 +1,69 @@
 #!/usr/bin/env python3
 """Room daemon - polls room inboxes, consolidates to thread.md.
 
+Each room's pending inbox is appended as one batch and fsync'd once
+(group commit) before the inbox files are moved to processed/.
+
 Auto-detects @mentions and adds participants to room.yaml.
 Gracefully skips tmux notifications when not available (e.g. in Docker).
-
-Env: ROOMS_DIR (default: /data/rooms)
+Notifications are debounced per agent session and merged into one digest
+prompt; @mentions are delivered immediately.
+Keeps a read cursor per participant per room so agents only fetch unread
+messages: `room_daemon.py unread ROOM PARTICIPANT`.
+Maintains a sparse time -> byte offset index (thread.idx) for range queries:
+`room_daemon.py range ROOM --since 2026-02-02T10:00 --until 2026-02-02T11:00`.
+
+Env: ROOMS_DIR (default: /data/rooms),
+     NOTIFY_DEBOUNCE (seconds, default: 15; 0 disables debouncing),
+     UNREAD_FIRST_FETCH (messages in a participant's first unread fetch, default: 20),
+     UNREAD_CMD (command shown to agents, default: this script with ROOMS_DIR set),
+     FSYNC_MODE (group | message | off, default: group),
+     GROUP_COMMIT_MAX (messages per group commit, default: 100)
 """
 
+import argparse
+import bisect
 import os
 import re
+import shlex
 import shutil
+import signal
 import subprocess
 import sys
+import tempfile
 import time
-from datetime import datetime, timezone
+from datetime import datetime, time as dt_time, timedelta, timezone
 from pathlib import Path
+from typing import Iterator
 
 import yaml
 
 ROOMS_DIR = Path(os.environ.get("ROOMS_DIR", "/data/rooms"))
+NOTIFY_DEBOUNCE = float(os.environ.get("NOTIFY_DEBOUNCE", "15"))
+# Messages returned by the first unread fetch of a participant with no cursor
+UNREAD_FIRST_FETCH = int(os.environ.get("UNREAD_FIRST_FETCH", "20"))
+# Agents run in their own working directory without ROOMS_DIR, so spell both out
+UNREAD_CMD = os.environ.get(
+    "UNREAD_CMD",
+    f"ROOMS_DIR={shlex.quote(str(ROOMS_DIR))} {shlex.quote(sys.executable)} "
+    f"{shlex.quote(str(Path(__file__).resolve()))} unread",
+)
+# group: one fsync per inbox batch, message: one fsync per message, off: no fsync
+FSYNC_MODE = os.environ.get("FSYNC_MODE", "group")
+FSYNC_MODES = ("group", "message", "off")
+GROUP_COMMIT_MAX = int(os.environ.get("GROUP_COMMIT_MAX", "100"))
+# Bytes of thread.md between thread.idx entries (a new UTC day always gets one)
+INDEX_INTERVAL_BYTES = 64 * 1024
+# Dating pre-index messages from processed/ inbox files: how far ahead to look
+# for the sender's file, and the most a consolidation may lag its inbox write
+PROCESSED_LOOKAHEAD = 50
+PROCESSED_MATCH_WINDOW = timedelta(hours=1)
+
+ENTRY_HEADER_RE = re.compile(r"\*\*(.+?)\*\*\s*\((\d{2}):(\d{2})(?::(\d{2}))?\):")
+
+# Pending digests keyed by participant (one tmux session each), holding per-room
+# senders/mentions/counts; flushed by flush_notifications()
+_pending_notifications: dict[str, dict] = {}
 
 
 def get_active_agents() -> dict[str, str]:
@@ -48,8 +93,14 @@ def extract_sender(filename: str) -> str:
     return Path(filename).stem
 
 
-def auto_add_participants(room_dir: Path, sender: str, body: str) -> list[str]:
-    """Detect @mentions, add sender + mentioned agents to room.yaml."""
+def auto_add_participants(
+    room_dir: Path, sender: str, body: str, entry_offset: int | None = None,
+) -> list[str]:
+    """Detect @mentions, add sender + mentioned agents to room.yaml.
+
+    Newly added participants get a read cursor at entry_offset (the message
+    that added them), so their first unread fetch starts there.
+    """
     room_yaml = room_dir / "room.yaml"
 
     if room_yaml.exists():
@@ -76,6 +127,9 @@ def auto_add_participants(room_dir: Path, sender: str, body: str) -> list[str]:
                 print(f"  Auto-added participant: {display_name} (from @{mention})")
 
     if len(participants) != original_count:
+        if entry_offset is not None:
+            for name in participants[original_count:]:
+                init_cursor(room_dir, name, entry_offset)
         config["participants"] = participants
         with open(room_yaml, "w", encoding="utf-8") as f:
             yaml.dump(config, f, default_flow_style=False)
@@ -83,82 +137,461 @@ def auto_add_participants(room_dir: Path, sender: str, body: str) -> list[str]:
     return participants
 
 
-def consolidate(message_path: Path) -> None:
-    """Read inbox message, append to thread.md, move to processed."""
-    room_dir = message_path.parent.parent
+def _cursor_path(room_dir: Path, participant: str) -> Path:
+    safe_name = re.sub(r"[^a-z0-9_-]", "", participant.lower()) or "guest"
+    return room_dir / "cursors" / safe_name
+
+
+def _write_cursor(cursor_path: Path, offset: int) -> None:
+    cursor_path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique temp name: the CLI and viewer threads may write the same cursor at once
+    with tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=cursor_path.parent, prefix=f".{cursor_path.name}.", delete=False,
+    ) as tmp:
+        tmp.write(str(offset))
+    os.replace(tmp.name, cursor_path)
+
+
+def init_cursor(room_dir: Path, participant: str, offset: int) -> None:
+    """Start participant's read cursor at offset unless they already have one."""
+    cursor_path = _cursor_path(room_dir, participant)
+    if not cursor_path.exists():
+        _write_cursor(cursor_path, offset)
+
+
+def _tail_offset(f, size: int, count: int) -> int:
+    """Offset of the count-th last message in thread.md (0 if there are fewer)."""
+    pos = size
+    data = b""
+    while pos > 0 and data.count(b"\n---\n") < count:
+        step = min(INDEX_INTERVAL_BYTES, pos)
+        pos -= step
+        f.seek(pos)
+        data = f.read(step) + data
+    end = len(data)
+    for _ in range(count):
+        end = data.rfind(b"\n---\n", 0, end)
+        if end < 0:
+            return 0
+    return pos + end
+
+
+def read_unread(room_dir: Path, participant: str, advance: bool = True) -> str:
+    """Return participant's unread thread.md messages and advance their cursor.
+
+    The cursor is a byte offset stored in cursors/<participant>. The
+    participant's own messages are left out of the result. With
+    advance=False the cursor is left where it is. Without a cursor yet,
+    only the last UNREAD_FIRST_FETCH messages are returned.
+    """
+    thread_path = room_dir / "thread.md"
+    cursor_path = _cursor_path(room_dir, participant)
+    try:
+        cursor = int(cursor_path.read_text(encoding="utf-8").strip() or 0)
+    except FileNotFoundError:
+        cursor = None
+    except ValueError:
+        cursor = 0
+
+    with open(thread_path, "rb") as f:
+        size = f.seek(0, os.SEEK_END)
+        if cursor is None:
+            cursor = _tail_offset(f, size, UNREAD_FIRST_FETCH)
+        elif cursor > size:
+            # Thread was truncated or replaced - start over
+            cursor = 0
+        f.seek(cursor)
+        data = f.read(size - cursor)
+
+    # Only consume complete lines in case an append is in flight
+    data = data[: data.rfind(b"\n") + 1]
+    new_cursor = cursor + len(data)
+
+    own_prefix = f"**{participant.lower()}**"
+    sections = data.decode("utf-8", errors="replace").split("\n---\n")
+    unread = [sections[0]] + [
+        section for section in sections[1:]
+        if not section.strip().lower().startswith(own_prefix)
+    ]
+
+    if advance and (new_cursor != cursor or not cursor_path.exists()):
+        _write_cursor(cursor_path, new_cursor)
+
+    return "\n---\n".join(unread)
+
+
+def append_entries(thread_path: Path, entries: list[str]) -> int:
+    """Append entries to thread.md, syncing to disk according to FSYNC_MODE.
+
+    Creates thread.md if missing. Returns the byte offset the entries start at.
+    """
+    with open(thread_path, "a", encoding="utf-8") as f:
+        offset = f.tell()
+        if FSYNC_MODE == "message":
+            for entry in entries:
+                f.write(entry)
+                f.flush()
+                os.fsync(f.fileno())
+            return offset
+        f.write("".join(entries))
+        if FSYNC_MODE == "group":
+            f.flush()
+            os.fsync(f.fileno())
+    return offset
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse an ISO date/time (e.g. 2026-02-02T10:00) as UTC unless it has an offset."""
+    parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def load_index(room_dir: Path) -> list[tuple[datetime, int]]:
+    """Read thread.idx: sparse, ascending (UTC datetime, byte offset) points.
+
+    Every index point starts a run of messages on a single UTC date, which
+    is how dateless HH:MM:SS entries in thread.md get their date back. The
+    daemon only indexes messages it appends itself, so the first point marks
+    where dated history begins.
+    """
+    index_path = room_dir / "thread.idx"
+    if not index_path.exists():
+        return []
+    points = []
+    for line in index_path.read_text(encoding="utf-8").splitlines():
+        try:
+            stamp, offset = line.split()
+            points.append((parse_timestamp(stamp), int(offset)))
+        except ValueError:
+            # Partially written last line
+            continue
+    return points
+
+
+def read_thread_header(room_dir: Path) -> str:
+    """Return the part of thread.md before the first message."""
+    lines = []
+    with open(room_dir / "thread.md", encoding="utf-8") as f:
+        for line in f:
+            if line.strip() == "---":
+                break
+            lines.append(line)
+    return "".join(lines)
+
+
+def _processed_stamps(room_dir: Path) -> list[tuple[datetime, str]]:
+    """(inbox datetime, sender) for each processed/ file, in thread order."""
+    stamps = []
+    for path in sorted((room_dir / "processed").glob("*.md")):
+        match = re.match(r"(\d{8}-\d{6})-(.+)\.md$", path.name)
+        if match:
+            written = datetime.strptime(match.group(1), "%Y%m%d-%H%M%S").replace(tzinfo=timezone.utc)
+            stamps.append((written, match.group(2)))
+    return stamps
+
+
+def _date_from_processed(
+    processed: list[tuple[datetime, str]], pos: int, sender: str, clock: dt_time,
+) -> tuple[datetime | None, int]:
+    """Date a pre-index entry from the next matching processed/ file.
+
+    Returns (timestamp, next position), or (None, pos) when no file by the
+    same sender was consolidated within PROCESSED_MATCH_WINDOW of it.
+    """
+    for i in range(pos, min(pos + PROCESSED_LOOKAHEAD, len(processed))):
+        written, file_sender = processed[i]
+        if file_sender != sender:
+            continue
+        stamp = datetime.combine(written.date(), clock, tzinfo=timezone.utc)
+        if stamp < written - timedelta(minutes=1):
+            # Consolidated after midnight
+            stamp += timedelta(days=1)
+        if stamp - written <= PROCESSED_MATCH_WINDOW:
+            return stamp, i + 1
+    return None, pos
+
+
+def _scan_thread(
+    room_dir: Path, points: list[tuple[datetime, int]], start: int | None = None,
+) -> Iterator[tuple[int, datetime | None, str]]:
+    """Yield (offset, timestamp, section) for each message from index point start.
+
+    Dates come from the index point covering each message. Messages written
+    before the index existed are dated from their processed/ inbox files;
+    those that can't be matched get no timestamp rather than a guessed one.
+    """
+    if start is None:
+        offset, day = 0, None
+        upcoming = list(points)
+        processed = _processed_stamps(room_dir)
+    else:
+        offset, day = points[start][1], points[start][0].date()
+        upcoming = points[start + 1:]
+        processed = []
+    processed_pos = 0
+
+    def finish(entry_offset: int, lines: list[bytes]):
+        nonlocal processed_pos
+        section = b"".join(lines).decode("utf-8", errors="replace")
+        match = ENTRY_HEADER_RE.match(section.lstrip())
+        if not match:
+            # Continuation of the previous message (e.g. a '---' inside its body)
+            return entry_offset, last_stamp, section
+        clock = dt_time(int(match.group(2)), int(match.group(3)), int(match.group(4) or 0))
+        if day is not None:
+            return entry_offset, datetime.combine(day, clock, tzinfo=timezone.utc), section
+        stamp, processed_pos = _date_from_processed(processed, processed_pos, match.group(1), clock)
+        return entry_offset, stamp, section
+
+    last_stamp = None
+    entry_offset = None
+    lines: list[bytes] = []
+    with open(room_dir / "thread.md", "rb") as f:
+        f.seek(offset)
+        pos = offset
+        for line in f:
+            if line.rstrip(b"\r\n") == b"---":
+                if entry_offset is not None:
+                    result = finish(entry_offset, lines)
+                    last_stamp = result[1]
+                    yield result
+                # Entries are written as "\n---\n..." - the offset is the leading newline
+                entry_offset = max(pos - 1, 0)
+                lines = []
+                while upcoming and upcoming[0][1] <= entry_offset:
+                    day = upcoming.pop(0)[0].date()
+            elif entry_offset is not None:
+                lines.append(line)
+            pos += len(line)
+    if entry_offset is not None:
+        yield finish(entry_offset, lines)
+
+
+def iter_messages(
+    room_dir: Path, since: datetime | None = None, until: datetime | None = None,
+) -> Iterator[str]:
+    """Yield thread.md message sections with since <= timestamp <= until.
+
+    Seeks via binary search over thread.idx, so the cost depends on the size
+    of the result rather than the length of the thread. Ranges reaching back
+    before the first index point also scan the messages written before it.
+    """
+    points = load_index(room_dir)
+    start = None
+    if since is not None and points:
+        first_after = bisect.bisect_left([stamp for stamp, _ in points], since)
+        if first_after > 0:
+            start = first_after - 1
+
+    for _, stamp, section in _scan_thread(room_dir, points, start):
+        if stamp is None:
+            if since is None and until is None:
+                yield section
+            continue
+        if until is not None and stamp > until:
+            return
+        if since is not None and stamp < since:
+            continue
+        yield section
+
+
+def _needs_index_point(points: list[tuple[datetime, int]], stamp: datetime, offset: int) -> bool:
+    if not points:
+        return True
+    last_stamp, last_offset = points[-1]
+    return stamp.date() != last_stamp.date() or offset - last_offset >= INDEX_INTERVAL_BYTES
+
+
+def _write_index(room_dir: Path, points: list[tuple[datetime, int]]) -> None:
+    with open(room_dir / "thread.idx", "a", encoding="utf-8") as f:
+        f.write("".join(f"{stamp.isoformat()} {offset}\n" for stamp, offset in points))
+        if FSYNC_MODE != "off":
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def update_index(room_dir: Path, offset: int, entries: list[tuple[datetime, str]]) -> None:
+    """Add index points for entries appended to thread.md at byte offset."""
+    points = load_index(room_dir)
+    new_points = []
+    for stamp, entry in entries:
+        if _needs_index_point(points + new_points, stamp, offset):
+            new_points.append((stamp, offset))
+        offset += len(entry.encode("utf-8"))
+    if new_points:
+        _write_index(room_dir, new_points)
+
+
+def consolidate(room_dir: Path, message_paths: list[Path]) -> None:
+    """Append a batch of inbox messages to thread.md, then move them to processed.
+
+    The batch is committed (written and fsync'd) before any inbox file is
+    moved, so a crash can at worst re-append a message, never lose one.
+    """
     room_name = room_dir.name
 
-    body = message_path.read_text(encoding="utf-8").strip()
-    sender = extract_sender(message_path.name)
-    timestamp = datetime.now(timezone.utc).strftime("%H:%M:%S")
+    messages = []
+    for message_path in message_paths:
+        try:
+            body = message_path.read_text(encoding="utf-8").strip()
+        except Exception as exc:
+            print(f"  ERROR: {message_path.name}: {exc}")
+            continue
+        messages.append((message_path, extract_sender(message_path.name), body))
+    if not messages:
+        return
 
-    thread_path = room_dir / "thread.md"
-    entry = f"\n---\n\n**{sender}** ({timestamp}):\n{body}\n"
-    with open(thread_path, "a", encoding="utf-8") as f:
-        f.write(entry)
+    entries = []
+    for _, sender, body in messages:
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+        entries.append((now, f"\n---\n\n**{sender}** ({now.strftime('%H:%M:%S')}):\n{body}\n"))
+
+    offset = append_entries(room_dir / "thread.md", [entry for _, entry in entries])
+    update_index(room_dir, offset, entries)
 
     processed_dir = room_dir / "processed"
     processed_dir.mkdir(parents=True, exist_ok=True)
-    shutil.move(str(message_path), str(processed_dir / message_path.name))
+    for message_path, _, _ in messages:
+        try:
+            shutil.move(str(message_path), str(processed_dir / message_path.name))
+        except Exception as exc:
+            print(f"  ERROR: moving {message_path.name}: {exc}")
 
-    print(f"  Consolidated: {sender} -> {room_name}/thread.md ({len(body)} chars)")
+    for (_, sender, body), (_, entry) in zip(messages, entries):
+        print(f"  Consolidated: {sender} -> {room_name}/thread.md ({len(body)} chars)")
 
-    participants = auto_add_participants(room_dir, sender, body)
-    mentions = [name for name in participants if f"@{name}" in body]
-    notify_participants(room_name, sender, body, participants, mentions)
+        entry_offset = offset
+        offset += len(entry.encode("utf-8"))
+        try:
+            participants = auto_add_participants(room_dir, sender, body, entry_offset)
+            mentions = [name for name in participants if f"@{name}" in body]
+            notify_participants(room_name, sender, body, participants, mentions)
+        except Exception as exc:
+            print(f"  ERROR: notifying for {sender}: {exc}")
 
 
 def notify_participants(
     room_name: str, sender: str, body: str,
     participants: list[str], mentions: list[str],
 ) -> None:
-    """Notify participants via tmux (skips gracefully if tmux unavailable)."""
-    thread_path = f"AI_Agents/signals/rooms/{room_name}/thread.md"
-
+    """Queue digest notifications; @mentioned participants are notified right away."""
+    now = time.monotonic()
     for participant in participants:
         if participant == sender:
             continue
 
-        session = f"{participant.lower()}_session"
+        if participant in mentions:
+            earlier = _pending_notifications.pop(participant, None)
+            send_notification(participant, build_mention_prompt(room_name, participant, sender, earlier))
+            continue
 
-        try:
-            check = subprocess.run(
-                ["tmux", "has-session", "-t", session],
-                capture_output=True, timeout=5,
-            )
-            if check.returncode != 0:
-                continue
-        except (FileNotFoundError, subprocess.TimeoutExpired):
+        pending = _pending_notifications.setdefault(participant, {"since": now, "rooms": {}})
+        room = pending["rooms"].setdefault(room_name, {"senders": [], "mentions": [], "count": 0})
+        room["count"] += 1
+        if sender not in room["senders"]:
+            room["senders"].append(sender)
+        for name in mentions:
+            if name not in room["mentions"]:
+                room["mentions"].append(name)
+
+        if NOTIFY_DEBOUNCE <= 0:
+            del _pending_notifications[participant]
+            send_notification(participant, build_digest_prompt(participant, pending))
+
+
+def flush_notifications(force: bool = False) -> None:
+    """Send digests whose debounce window has elapsed (all of them if force)."""
+    now = time.monotonic()
+    for participant, pending in list(_pending_notifications.items()):
+        if not force and now - pending["since"] < NOTIFY_DEBOUNCE:
             continue
+        del _pending_notifications[participant]
+        send_notification(participant, build_digest_prompt(participant, pending))
+
+
+def _reply_file(room_name: str, participant: str) -> str:
+    inbox_path = f"AI_Agents/signals/rooms/{room_name}/inbox"
+    ts_hint = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    return f"{inbox_path}/{ts_hint}-{participant}.md"
+
+
+def _summarise_room(room: dict, label: str = "msg(s)") -> str:
+    """'3 msg(s) from A, B (mentions: @C)' for one room of a queued digest."""
+    summary = f"{room['count']} {label} from {', '.join(room['senders'])}"
+    if room["mentions"]:
+        summary += " (mentions: " + ", ".join(f"@{m}" for m in room["mentions"]) + ")"
+    return summary
+
+
+def _summarise_digest(pending: dict) -> str:
+    return "; ".join(
+        f"{room_name}: {_summarise_room(room)}" for room_name, room in pending["rooms"].items()
+    )
+
+
+def build_mention_prompt(
+    room_name: str, participant: str, sender: str, earlier: dict | None,
+) -> str:
+    """Prompt for a direct @mention, folding in the participant's queued digest."""
+    ts_tag = datetime.now(timezone.utc).strftime("%H:%M")
+    queued = ""
+    if earlier:
+        total = sum(room["count"] for room in earlier["rooms"].values())
+        queued = f" (+{total} earlier msg(s) -- {_summarise_digest(earlier)})"
+    return (
+        f"[Room:{room_name} {ts_tag}]: @{participant} from {sender}{queued}. "
+        f"Read: {UNREAD_CMD} {shlex.quote(room_name)} {shlex.quote(participant)} -- "
+        f"WRITE reply to {_reply_file(room_name, participant)} (NOT thread.md) -- "
+        f"Keep short (1-2 lines). No confirmations of confirmations."
+    )
+
+
+def build_digest_prompt(participant: str, pending: dict) -> str:
+    """Single prompt summarising every message queued for a participant, across rooms."""
+    ts_tag = datetime.now(timezone.utc).strftime("%H:%M")
+    rooms = pending["rooms"]
+    if len(rooms) == 1:
+        (room_name, room), = rooms.items()
+        return (
+            f"[Room:{room_name} {ts_tag}]: {_summarise_room(room, 'new msg(s)')}. "
+            f"Read unread: {UNREAD_CMD} {shlex.quote(room_name)} {shlex.quote(participant)} -- "
+            f"Default: SILENCE. Only reply if your SME domain adds new info. "
+            f"If replying, WRITE to {_reply_file(room_name, participant)} (NOT thread.md, 1-2 lines)."
+        )
 
-        ts_tag = datetime.now(timezone.utc).strftime("%H:%M")
-        inbox_path = f"AI_Agents/signals/rooms/{room_name}/inbox"
-        ts_hint = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
-        reply_file = f"{inbox_path}/{ts_hint}-{participant}.md"
-        is_mentioned = participant in mentions
-        if is_mentioned:
-            msg = (
-                f"[Room:{room_name} {ts_tag}]: @{participant} from {sender}. "
-                f"Read: cat {thread_path} -- "
-                f"WRITE reply to {reply_file} (NOT thread.md) -- "
-                f"Keep short (1-2 lines). No confirmations of confirmations."
-            )
-        else:
-            msg = (
-                f"[Room:{room_name} {ts_tag}]: New msg from {sender}. "
-                f"Read: tail -50 {thread_path} (need more context? tail -200 or -500) -- "
-                f"Default: SILENCE. Only reply if your SME domain adds new info. "
-                f"If replying, WRITE to {reply_file} (NOT thread.md, 1-2 lines)."
-            )
+    total = sum(room["count"] for room in rooms.values())
+    return (
+        f"[Rooms {ts_tag}]: {total} new msg(s) in {len(rooms)} rooms -- {_summarise_digest(pending)}. "
+        f"Read unread per room: {UNREAD_CMD} ROOM {shlex.quote(participant)} -- "
+        f"Default: SILENCE. Only reply if your SME domain adds new info. "
+        f"If replying, WRITE to {_reply_file('ROOM', participant)} (NOT thread.md, 1-2 lines)."
+    )
 
-        try:
-            subprocess.run(["tmux", "send-keys", "-t", session, msg], timeout=5)
-            time.sleep(0.5)
-            subprocess.run(["tmux", "send-keys", "-t", session, "Enter"], timeout=5)
-            print(f"  Notified: {participant} ({session})")
-            time.sleep(0.3)
-        except (FileNotFoundError, subprocess.TimeoutExpired):
-            pass
+
+def send_notification(participant: str, msg: str) -> None:
+    """Type msg into the participant's tmux session (skips if tmux unavailable)."""
+    session = f"{participant.lower()}_session"
+
+    try:
+        check = subprocess.run(
+            ["tmux", "has-session", "-t", session],
+            capture_output=True, timeout=5,
+        )
+        if check.returncode != 0:
+            return
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        return
+
+    try:
+        subprocess.run(["tmux", "send-keys", "-t", session, msg], timeout=5)
+        time.sleep(0.5)
+        subprocess.run(["tmux", "send-keys", "-t", session, "Enter"], timeout=5)
+        print(f"  Notified: {participant} ({session})")
+        time.sleep(0.3)
+    except (FileNotFoundError, subprocess.TimeoutExpired):
+        pass
 
 
 def scan_rooms() -> None:
@@ -169,16 +602,54 @@ def scan_rooms() -> None:
         inbox_dir = room_dir / "inbox"
         if not inbox_dir.exists():
             continue
-        for md_file in sorted(inbox_dir.glob("*.md")):
+        md_files = sorted(inbox_dir.glob("*.md"))
+        for start in range(0, len(md_files), GROUP_COMMIT_MAX):
+            batch = md_files[start:start + GROUP_COMMIT_MAX]
             ts = datetime.now(timezone.utc).strftime("%H:%M:%S")
-            print(f"[{ts}] Found: {room_dir.name}/inbox/{md_file.name}")
+            for md_file in batch:
+                print(f"[{ts}] Found: {room_dir.name}/inbox/{md_file.name}")
             try:
-                consolidate(md_file)
+                consolidate(room_dir, batch)
             except Exception as exc:
                 print(f"  ERROR: {exc}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Room daemon")
+    subparsers = parser.add_subparsers(dest="command")
+    unread_parser = subparsers.add_parser(
+        "unread", help="print a participant's unread messages and mark them read",
+    )
+    unread_parser.add_argument("room")
+    unread_parser.add_argument("participant")
+    range_parser = subparsers.add_parser(
+        "range", help="print messages in a UTC time range (ISO, e.g. 2026-02-02T10:00)",
+    )
+    range_parser.add_argument("room")
+    range_parser.add_argument("--since", type=parse_timestamp)
+    range_parser.add_argument("--until", type=parse_timestamp)
+    args = parser.parse_args()
+
+    if args.command == "range":
+        room_dir = ROOMS_DIR / args.room
+        if not (room_dir / "thread.md").exists():
+            sys.exit(f"Room not found: {args.room}")
+        for section in iter_messages(room_dir, args.since, args.until):
+            sys.stdout.write(f"---\n{section}")
+        return
+
+    if args.command == "unread":
+        room_dir = ROOMS_DIR / args.room
+        if not (room_dir / "thread.md").exists():
+            sys.exit(f"Room not found: {args.room}")
+        sys.stdout.write(read_unread(room_dir, args.participant))
+        return
+
+    if FSYNC_MODE not in FSYNC_MODES:
+        sys.exit(f"Invalid FSYNC_MODE={FSYNC_MODE!r} (expected one of: {', '.join(FSYNC_MODES)})")
+    if GROUP_COMMIT_MAX < 1:
+        sys.exit(f"Invalid GROUP_COMMIT_MAX={GROUP_COMMIT_MAX} (must be at least 1)")
+
     ROOMS_DIR.mkdir(parents=True, exist_ok=True)
 
     # Create default lobby room if no rooms exist
@@ -198,13 +669,19 @@ def main():
 
     rooms = [d.name for d in ROOMS_DIR.iterdir() if d.is_dir() and (d / "inbox").exists()]
     print(f"Room daemon running (polling). Watching {len(rooms)} room(s): {', '.join(rooms)}")
-    print("Scanning every 1s.\n")
+    print(f"Scanning every 1s. Notification debounce: {NOTIFY_DEBOUNCE:g}s, fsync: {FSYNC_MODE}\n")
 
+    # Treat SIGTERM (restarts, redeploys) like Ctrl-C so queued digests get sent
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     try:
         while True:
             scan_rooms()
+            flush_notifications()
             time.sleep(1)
     except KeyboardInterrupt:
+        pass
+    finally:
+        flush_notifications(force=True)
         print("\nRoom daemon stopped.")
 
 
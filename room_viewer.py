@@ -2,6 +2,11 @@
 """Room chat web UI - overview, thread viewer, room creation, chat input.
 
 Live-refreshes via JS fetch (no full page reload). Pauses refresh when typing.
+Room pages are streamed with chunked transfer encoding (HTTP/1.1).
+API: GET /api/<room>/unread?participant=<name> returns unread messages as
+text/plain; POST to the same URL also advances that participant's read cursor.
+GET /api/<room>/messages?since=&until= (and the room page itself) return
+only messages in that UTC time range, located via the daemon's thread.idx.
 Env: ROOMS_DIR (default: /data/rooms), DEFAULT_SENDER (default: Guest)
 """
 
@@ -12,11 +17,14 @@ import re
 import subprocess
 import urllib.parse
 from datetime import datetime, timezone
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from pathlib import Path
+from typing import Iterator
 
 import yaml
 
+from room_daemon import iter_messages, parse_timestamp, read_thread_header, read_unread
+
 
 def get_online_agents() -> list[dict]:
     """Get list of online agents from tmux sessions.
@@ -59,12 +67,12 @@ def get_room_message_counts(room_name: str) -> dict[str, int]:
         return {}
 
     counts: dict[str, int] = {}
-    raw = thread_path.read_text(encoding="utf-8")
-
-    # Match **SenderName** (HH:MM:SS): pattern
-    for match in re.finditer(r"\*\*(.+?)\*\*\s*\(\d{2}:\d{2}:\d{2}\):", raw):
-        sender = match.group(1)
-        counts[sender] = counts.get(sender, 0) + 1
+    with open(thread_path, encoding="utf-8") as f:
+        for line in f:
+            # Match **SenderName** (HH:MM:SS): pattern
+            for match in re.finditer(r"\*\*(.+?)\*\*\s*\(\d{2}:\d{2}:\d{2}\):", line):
+                sender = match.group(1)
+                counts[sender] = counts.get(sender, 0) + 1
 
     return counts
 
@@ -131,7 +139,10 @@ setInterval(async () => {
   try {
     const active = document.activeElement;
     if (active && (active.tagName === 'INPUT' || active.tagName === 'TEXTAREA')) return;
-    const resp = await fetch(location.pathname);
+    const params = new URLSearchParams(location.search);
+    params.delete('flash');
+    const query = params.toString();
+    const resp = await fetch(location.pathname + (query ? '?' + query : ''));
     if (!resp.ok) return;
     const html = await resp.text();
     const parser = new DOMParser();
@@ -168,6 +179,9 @@ PAGE_TEMPLATE = """<!DOCTYPE html>
 </body>
 </html>"""
 
+# Room pages are streamed: head first, then messages, then sidebar + script
+PAGE_HEAD, PAGE_TAIL = PAGE_TEMPLATE.split("{content}")
+
 
 def render_agents_sidebar(room_name: str = "") -> str:
     """Render the online agents sidebar box(es).
@@ -329,26 +343,42 @@ def render_overview(sort: str = "recent") -> str:
     )
 
 
-def render_thread(room_name: str, flash: str = "") -> str:
-    thread_path = ROOMS_DIR / room_name / "thread.md"
+def render_thread(
+    room_name: str, flash: str = "",
+    since: datetime | None = None, until: datetime | None = None,
+) -> Iterator[str]:
+    """Render a room page as a stream of HTML chunks.
+
+    The page head is yielded before thread.md is opened and each message as
+    soon as it is parsed, so memory stays flat however long the thread is.
+    """
+    room_dir = ROOMS_DIR / room_name
+    thread_path = room_dir / "thread.md"
     if not thread_path.exists():
-        return PAGE_TEMPLATE.format(
+        yield PAGE_TEMPLATE.format(
             title=f"Room: {room_name}",
             style=STYLE,
             content=f"<h1>Room not found: {html.escape(room_name)}</h1><p><a href='/'>&larr; All rooms</a></p>",
             sidebar=render_agents_sidebar(room_name),
             script="",
         )
+        return
 
-    raw = thread_path.read_text(encoding="utf-8")
-    sections = raw.split("\n---\n")
+    yield PAGE_HEAD.format(title=f"Room: {room_name}", style=STYLE)
+    yield '<p><a href="/">&larr; All rooms</a></p>\n'
 
-    parts = ['<p><a href="/">&larr; All rooms</a></p>']
+    header = read_thread_header(room_dir).strip()
+    yield f"<div class='meta'>{simple_md(header)}</div>\n"
 
-    header = sections[0].strip()
-    parts.append(f"<div class='meta'>{simple_md(header)}</div>")
+    if since or until:
+        since_label = since.strftime("%Y-%m-%d %H:%M:%S") if since else "start"
+        until_label = until.strftime("%Y-%m-%d %H:%M:%S") if until else "now"
+        yield (
+            f"<div class='meta'>Showing {since_label} &ndash; {until_label} UTC &middot; "
+            f"<a href='/{html.escape(room_name)}'>full thread</a></div>\n"
+        )
 
-    for section in sections[1:]:
+    for section in iter_messages(room_dir, since, until):
         section = section.strip()
         if not section:
             continue
@@ -359,20 +389,20 @@ def render_thread(room_name: str, flash: str = "") -> str:
             timestamp = html.escape(match.group(2))
             body = simple_md(match.group(3).strip())
             msg_class = "message human" if sender_raw == "Christian" else "message"
-            parts.append(
+            yield (
                 f'<div class="{msg_class}">'
                 f'<span class="sender">{sender}</span> '
                 f'<span class="time">({timestamp} UTC)</span>'
                 f'<div class="body">{body}</div>'
-                f'</div>'
+                f'</div>\n'
             )
         else:
-            parts.append(f'<div class="message"><div class="body">{simple_md(section)}</div></div>')
+            yield f'<div class="message"><div class="body">{simple_md(section)}</div></div>\n'
 
     if flash:
-        parts.append(f'<div class="flash">{html.escape(flash)}</div>')
+        yield f'<div class="flash">{html.escape(flash)}</div>\n'
 
-    parts.append(
+    yield (
         f'<div class="chat-form">'
         f'<form method="POST" action="/{html.escape(room_name)}">'
         f'<label for="sender">Your name:</label>'
@@ -381,20 +411,17 @@ def render_thread(room_name: str, flash: str = "") -> str:
         f'<textarea id="msg" name="msg" placeholder="Type your message..." required></textarea>'
         f'<button type="submit">Send to room</button>'
         f'</form>'
-        f'</div>'
+        f'</div>\n'
     )
 
-    parts.append(
+    yield (
         '<div class="status">Auto-refreshes every 3s &middot; '
-        'Messages go to inbox &rarr; daemon consolidates to thread</div>'
+        'Messages go to inbox &rarr; daemon consolidates to thread</div>\n'
     )
 
-    parts.append('<p><a href="/">&larr; All rooms</a></p>')
+    yield '<p><a href="/">&larr; All rooms</a></p>'
 
-    return PAGE_TEMPLATE.format(
-        title=f"Room: {room_name}",
-        style=STYLE,
-        content="\n".join(parts),
+    yield PAGE_TAIL.format(
         sidebar=render_agents_sidebar(room_name),
         script=LIVE_REFRESH_SCRIPT.replace("INTERVAL", "3000"),
     )
@@ -412,30 +439,140 @@ def simple_md(text: str) -> str:
 
 
 class RoomHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 for chunked room pages; every response sets Content-Length or is chunked
+    protocol_version = "HTTP/1.1"
     default_room = "lobby"
+    # Stream chunks are coalesced up to this size to keep socket writes few
+    stream_chunk_size = 16 * 1024
 
     def do_GET(self):
         path = self.path.strip("/").split("?")[0]
 
+        if path.startswith("api/"):
+            self._handle_api(path)
+            return
+
         if not path:
             sort = "recent"
             if "?" in self.path:
                 qs = urllib.parse.parse_qs(self.path.split("?", 1)[1])
                 sort = qs.get("sort", ["recent"])[0]
-            content = render_overview(sort=sort)
+            self._send_html(render_overview(sort=sort))
         elif (ROOMS_DIR / path / "thread.md").exists():
             flash = ""
+            since = until = None
             if "?" in self.path:
                 qs = urllib.parse.parse_qs(self.path.split("?", 1)[1])
                 flash = qs.get("flash", [""])[0]
-            content = render_thread(path, flash=flash)
+                try:
+                    since, until = self._parse_range(qs)
+                except ValueError:
+                    flash = "Invalid since/until - use e.g. 2026-02-02T10:00"
+            self._send_chunked(render_thread(path, flash=flash, since=since, until=until))
         else:
-            content = render_thread(self.default_room)
+            self._send_chunked(render_thread(self.default_room))
 
+    def _send_html(self, content):
+        body = content.encode("utf-8")
         self.send_response(200)
         self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(content.encode("utf-8"))
+        self.wfile.write(body)
+
+    def _send_chunked(self, chunks):
+        """Stream HTML chunks with Transfer-Encoding: chunked.
+
+        The first chunk goes out immediately; later ones are coalesced up to
+        stream_chunk_size so a long thread is not one write per message.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(data):
+            self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+        try:
+            buffer = bytearray()
+            first = True
+            for chunk in chunks:
+                buffer += chunk.encode("utf-8")
+                if first or len(buffer) >= self.stream_chunk_size:
+                    write_chunk(bytes(buffer))
+                    buffer.clear()
+                    first = False
+            if buffer:
+                write_chunk(bytes(buffer))
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+    def _redirect(self, location):
+        self.send_response(303)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _handle_api(self, path, params=None):
+        """Serve /api/<room>/... GETs; params is the form body for POSTs."""
+        qs = {}
+        if "?" in self.path:
+            qs = urllib.parse.parse_qs(self.path.split("?", 1)[1])
+        if params:
+            qs.update(params)
+
+        segments = path.split("/")
+        if len(segments) != 3 or segments[2] not in ("unread", "messages"):
+            self._send_text(404, "Unknown endpoint\n")
+            return
+
+        room_name = segments[1]
+        room_dir = ROOMS_DIR / room_name
+        if not re.fullmatch(r"[a-z0-9][a-z0-9-]*", room_name) or not (room_dir / "thread.md").exists():
+            self._send_text(404, f"Room not found: {room_name}\n")
+            return
+
+        if segments[2] == "messages" and params is None:
+            try:
+                since, until = self._parse_range(qs)
+            except ValueError:
+                self._send_text(400, "Invalid since/until - use e.g. 2026-02-02T10:00\n")
+                return
+            text = "".join(f"---\n{section}" for section in iter_messages(room_dir, since, until))
+            self._send_text(200, text)
+            return
+
+        if segments[2] != "unread":
+            self._send_text(405, "Method not allowed\n")
+            return
+
+        participant = qs.get("participant", [""])[0].strip()
+        if not participant:
+            self._send_text(400, "Missing ?participant=\n")
+            return
+
+        # GET only peeks so crawlers and prefetchers can't mark messages read
+        self._send_text(200, read_unread(room_dir, participant, advance=params is not None))
+
+    @staticmethod
+    def _parse_range(qs):
+        """Return (since, until) datetimes from ?since=/?until=, None when absent."""
+        since = qs.get("since", [""])[0].strip()
+        until = qs.get("until", [""])[0].strip()
+        return (
+            parse_timestamp(since) if since else None,
+            parse_timestamp(until) if until else None,
+        )
+
+    def _send_text(self, status, text):
+        body = text.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
 
     def do_POST(self):
         path = self.path.strip("/").split("?")[0]
@@ -444,7 +581,9 @@ class RoomHandler(BaseHTTPRequestHandler):
         raw_body = self.rfile.read(content_length).decode("utf-8")
         params = urllib.parse.parse_qs(raw_body)
 
-        if not path:
+        if path.startswith("api/"):
+            self._handle_api(path, params)
+        elif not path:
             self._handle_create_room(params)
         else:
             room_name = path if (ROOMS_DIR / path).is_dir() else self.default_room
@@ -456,16 +595,12 @@ class RoomHandler(BaseHTTPRequestHandler):
 
         safe_name = re.sub(r"[^a-z0-9-]", "", room_input.lower().replace(" ", "-"))
         if not safe_name:
-            self.send_response(303)
-            self.send_header("Location", "/?flash=Invalid+room+name")
-            self.end_headers()
+            self._redirect("/?flash=Invalid+room+name")
             return
 
         room_dir = ROOMS_DIR / safe_name
         if room_dir.exists():
-            self.send_response(303)
-            self.send_header("Location", f"/{safe_name}?flash=Room+already+exists")
-            self.end_headers()
+            self._redirect(f"/{safe_name}?flash=Room+already+exists")
             return
 
         (room_dir / "inbox").mkdir(parents=True, exist_ok=True)
@@ -490,9 +625,7 @@ class RoomHandler(BaseHTTPRequestHandler):
             (room_dir / "inbox" / f"{ts}-{safe_sender}.md").write_text(first_msg, encoding="utf-8")
 
         flash = f"Room '{safe_name}' created"
-        self.send_response(303)
-        self.send_header("Location", f"/{safe_name}?flash={urllib.parse.quote(flash)}")
-        self.end_headers()
+        self._redirect(f"/{safe_name}?flash={urllib.parse.quote(flash)}")
 
     def _handle_chat_message(self, room_name, params):
         sender = params.get("sender", ["Guest"])[0].strip()
@@ -511,9 +644,7 @@ class RoomHandler(BaseHTTPRequestHandler):
         else:
             flash = "Message empty - not sent"
 
-        self.send_response(303)
-        self.send_header("Location", f"/{room_name}?flash={urllib.parse.quote(flash)}")
-        self.end_headers()
+        self._redirect(f"/{room_name}?flash={urllib.parse.quote(flash)}")
 
     def log_message(self, format, *args):
         pass
@@ -526,7 +657,7 @@ def main():
     args = parser.parse_args()
 
     RoomHandler.default_room = args.room
-    server = HTTPServer(("0.0.0.0", args.port), RoomHandler)
+    server = ThreadingHTTPServer(("0.0.0.0", args.port), RoomHandler)
 
     ROOMS_DIR.mkdir(parents=True, exist_ok=True)
     rooms = [d.name for d in ROOMS_DIR.iterdir() if d.is_dir() and (d / "thread.md").exists()]